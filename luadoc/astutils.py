@@ -1,73 +1,148 @@
 from luaparser.astnodes import *
+import luaparser.astnodes as astnodes
 
 
-class IdentifierVisitor:
-    def __init__(self):
-        self.identifier = ""
+class _DispatchTable(dict):
+    """ {node class: visit function} table.
+        A class without its own visit_<NodeClass> method gets the one of its
+        nearest base class (in MRO order), resolved on first use and cached.
+    """
 
-    def visit(self, node):
-        if node is None:
-            return
-        if isinstance(node, Node):
-            name = 'visit_' + node.__class__.__name__
-            visitor = getattr(self, name, None)
+    def __missing__(self, node_cls):
+        visitor = None
+        for base in node_cls.__mro__[1:]:
+            visitor = dict.get(self, base)
             if visitor:
-                visitor(node)
+                break
+        self[node_cls] = visitor
+        return visitor
+
+
+class AstVisitor:
+    """ Base class of ast visitors.
+        visit_<NodeClass> methods are collected once per visitor class
+        in a {node class: function} table (see _DispatchTable).
+
+        Node classes without a handler are leaves for the visitor: the walk
+        does not descend into them.
+    """
+    _DISPATCH = _DispatchTable()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._DISPATCH = cls._build_dispatch()
+
+    @classmethod
+    def _build_dispatch(cls):
+        dispatch = _DispatchTable()
+        for name in dir(cls):
+            if name.startswith('visit_'):
+                node_cls = getattr(astnodes, name[len('visit_'):], None)
+                if isinstance(node_cls, type):
+                    dispatch[node_cls] = getattr(cls, name)
+        return dispatch
+
+    def visit(self, node):
+        """ Visit a node or a list of nodes, None and unhandled nodes are ignored.
+        """
+        visitor = self._DISPATCH[type(node)]
+        if visitor:
+            visitor(self, node)
+        elif type(node) is list:
+            self._visit_list(node)
+
+    def _visit_list(self, nodes):
+        """ Visit a list of nodes in source order, a falsy value is ignored.
+        """
+        if nodes:
+            dispatch = self._DISPATCH
+            for node in nodes:
+                visitor = dispatch[type(node)]
+                if visitor:
+                    visitor(self, node)
+                elif type(node) is list:  # luaparser only builds plain lists
+                    self._visit_list(node)
+
+
+class _LastLeafVisitor(AstVisitor):
+    """ Keep the last leaf value in source order.
+        Children are visited in reverse order and the walk stops
+        (found = True) on the first leaf, which skips the rest of the subtree.
+    """
+    found = False
 
-        elif isinstance(node, list):
-            for n in node:
-                self.visit(n)
+    def visit(self, node):
+        if not self.found:
+            visitor = self._DISPATCH[type(node)]
+            if visitor:
+                visitor(self, node)
+
+    def _visit_list(self, nodes):
+        """ Visit a list of nodes in reverse order, a falsy value is ignored.
+        """
+        if nodes:
+            dispatch = self._DISPATCH
+            for node in reversed(nodes):
+                if self.found:
+                    return
+                visitor = dispatch[type(node)]
+                if visitor:
+                    visitor(self, node)
+
+
+class IdentifierVisitor(_LastLeafVisitor):
+    def __init__(self):
+        self.identifier = ""
 
     def visit_Chunk(self, node: Chunk):
         self.visit(node.body)
 
     def visit_Block(self, node):
-        self.visit(node.body)
-
-    def visit_Node(self, node):
-        pass
+        self._visit_list(node.body)
 
     def visit_Assign(self, node):
-        self.visit(node.targets)
-        # self.visit(node.values)
+        self._visit_list(node.targets)
+        # self._visit_list(node.values)
 
     def visit_LocalAssign(self, node):
-        self.visit(node.targets)
-        # self.visit(node.values)
+        self._visit_list(node.targets)
+        # self._visit_list(node.values)
 
     def visit_Function(self, node: Function):
-        self.visit(node.args)
         self.visit(node.body)
+        self._visit_list(node.args)
 
     def visit_LocalFunction(self, node: LocalFunction):
-        # self.visit(node.args)
+        # self._visit_list(node.args)
         self.visit(node.name)
         # self.visit(node.body)
 
     def visit_Method(self, node: Method):
-        self.visit(node.source)
-        self.visit(node.args)
         self.visit(node.body)
+        self._visit_list(node.args)
+        self.visit(node.source)
 
     def visit_Index(self, node):
-        self.visit(node.value)
         self.visit(node.idx)
+        self.visit(node.value)
 
     def visit_Name(self, node: Name):
         self.identifier = node.id
+        self.found = True
 
     def visit_String(self, node: String):
         self.identifier = node.s
+        self.found = True
 
     def visit_Table(self, node):
-        self.visit(node.fields)
+        self._visit_list(node.fields)
 
     def visit_Field(self, node: Field):
-        self.visit(node.key)
         self.visit(node.value)
+        self.visit(node.key)
 
     def visit_Return(self, node):
-        self.visit(node.values)
+        self._visit_list(node.values)
 
 
 def get_identifier(node: Node) -> str:
@@ -81,82 +156,71 @@ def get_identifier(node: Node) -> str:
     return visitor.identifier
 
 
-class ValueVisitor:
+class ValueVisitor(_LastLeafVisitor):
     def __init__(self):
         self.value: any = None
 
-    def visit(self, node):
-        if node is None:
-            return
-        if isinstance(node, Node):
-            name = 'visit_' + node.__class__.__name__
-            visitor = getattr(self, name, None)
-            if visitor:
-                visitor(node)
-
-        elif isinstance(node, list):
-            for n in node:
-                self.visit(n)
-
     def visit_Chunk(self, node: Chunk):
         self.visit(node.body)
 
     def visit_Block(self, node):
-        self.visit(node.body)
-
-    def visit_Node(self, node):
-        pass
+        self._visit_list(node.body)
 
     def visit_Assign(self, node):
-        # self.visit(node.targets)
-        self.visit(node.values)
+        # self._visit_list(node.targets)
+        self._visit_list(node.values)
 
     def visit_LocalAssign(self, node):
-        # self.visit(node.targets)
-        self.visit(node.values)
+        # self._visit_list(node.targets)
+        self._visit_list(node.values)
 
     def visit_Function(self, node: Function):
-        self.visit(node.args)
         self.visit(node.body)
+        self._visit_list(node.args)
 
     def visit_LocalFunction(self, node: LocalFunction):
-        # self.visit(node.args)
+        # self._visit_list(node.args)
         self.visit(node.name)
         # self.visit(node.body)
 
     def visit_Method(self, node: Method):
-        self.visit(node.source)
-        self.visit(node.args)
         self.visit(node.body)
+        self._visit_list(node.args)
+        self.visit(node.source)
 
     def visit_Index(self, node):
-        self.visit(node.value)
         self.visit(node.idx)
+        self.visit(node.value)
 
     def visit_String(self, node: String):
         self.value = node.s
+        self.found = True
 
     def visit_Nil(self, node: Nil):
         self.value = None
+        self.found = True
 
     def visit_TrueExpr(self, node: TrueExpr):
         self.value = True
+        self.found = True
 
     def visit_FalseExpr(self, node: FalseExpr):
         self.value = False
+        self.found = True
 
     def visit_Number(self, node: Number):
         self.value = node.n
+        self.found = True
 
     def visit_Table(self, node):
-        self.visit(node.fields)
+        self._visit_list(node.fields)
 
     def visit_Field(self, node: Field):
-        self.visit(node.key)
         self.visit(node.value)
+        self.visit(node.key)
 
     def visit_Return(self, node):
-        self.visit(node.values)
+        self._visit_list(node.values)
 
 
 def get_value(node: Node) -> str:
@@ -0,0 +1,139 @@
+import sys
+import os
+import logging
+import argparse
+from luadoc.version import __version__
+from luadoc.core import FilesProcessor, Configuration
+from luadoc.parser import DocOptions
+
+
+def abort(msg):
+    sys.stderr.write(msg + '\n')
+    sys.exit()
+
+
+def find_files(directory: str, ext_tuple):
+    """ Recursively yield file paths ending with one of ext_tuple (all files if None).
+        Use os.scandir which reuse the file type returned by readdir instead of
+        doing a stat() call per entry.
+    """
+    stack = [directory]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif ext_tuple is None or entry.name.endswith(ext_tuple):
+                    yield entry.path
+
+
+def create_arg_parser() -> argparse.ArgumentParser:
+    default = DocOptions()
+
+    parser = argparse.ArgumentParser(prog='luadoc')
+    parser.add_argument('--version', action='version', version='%(prog)s ' + __version__)
+    parser.add_argument('path', nargs='?', metavar='file|directory')
+
+    cli_group = parser.add_argument_group("CLI Options")
+    cli_group.add_argument('-s', '--source',
+                           metavar='S',
+                           dest='source',
+                           help='source passed in a string')
+    cli_group.add_argument('--config',
+                           metavar='F',
+                           dest='config_file',
+                           help='path to config file')
+    cli_group.add_argument('--config-generate',
+                           action='store_true',
+                           dest='config_generate',
+                           help='generate a default config file')
+    cli_group.add_argument('-d', '--debug',
+                           action='store_true',
+                           dest='debug',
+                           help='enable debugging messages')
+    cli_group.add_argument('-j', '--jobs',
+                           metavar='N', type=int,
+                           dest='jobs',
+                           help='number of parallel jobs in recursive mode',
+                           default=4)
+    cli_group.add_argument('--cache-dir',
+                           metavar='DIR',
+                           dest='cache_dir',
+                           help='cache parsed files in this directory (disabled by default, never pruned)')
+    cli_group.add_argument('--pretty',
+                           action='store_true',
+                           dest='pretty',
+                           help='python pretty print style')
+    cli_group.add_argument('--type',
+                           action="append",
+                           dest='extensions',
+                           metavar='EXT',
+                           help='file extension to indent (can be repeated) [lua]',
+                           default=['lua'])
+    cli_group.add_argument('-p', '--prefix',
+                           metavar='S',
+                           dest='comment_prefix',
+                           help='the comment prefix used to recognize luadoc comments',
+                           default=default.comment_prefix)
+    return parser
+
+
+def main():
+    options = create_arg_parser().parse_args()
+
+    # generate config
+    if options.config_generate:
+        Configuration().generate_default('./luadoc.json')
+        sys.exit()
+
+    # check argument:
+    if not options.source and not options.path:
+        abort('Expected a filepath')
+
+    # handle options:
+    if options.debug:
+        logging.basicConfig(level=logging.DEBUG, format='%(levelname)s:\t%(message)s')
+    else:
+        logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+    # create doc options
+    doc_options = DocOptions()
+    doc_options.comment_prefix = options.comment_prefix
+
+    # build a filename list or use source (-s)
+    if options.source:
+        model = FilesProcessor(8, doc_options).run_for_source(options.source, "")
+    else:
+        filenames = []
+        if not os.path.isdir(options.path):
+            filenames.append(options.path)
+        else:
+            if options.extensions:
+                ext_tuple = tuple('.' + ext.lstrip('.') for ext in options.extensions)
+            else:
+                ext_tuple = None
+
+            filenames.extend(find_files(options.path, ext_tuple))
+
+        # process files
+        processor = FilesProcessor(options.jobs, doc_options, options.cache_dir)
+
+        if not options.pretty:
+            # stream json output as files are processed
+            from luadoc.printers import JSONArrayWriter
+
+            writer = JSONArrayWriter(sys.stdout)
+            processor.run(filenames, writer.write)
+            writer.close()
+            print()
+            return
+
+        model = processor.run(filenames)
+
+    # render, printers are only needed here
+    from luadoc.printers import to_pretty_str, to_pretty_json
+
+    if options.pretty:
+        print(to_pretty_str(model))
+    else:
+        print(to_pretty_json(model))
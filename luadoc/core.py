@@ -1,81 +1,227 @@
 import os
-import sys
+import copy
 import time
 import json
+import pickle
+import hashlib
+import tempfile
 import concurrent.futures
 import logging
+from luadoc.version import __version__
+from typing import Callable, List
 from luadoc.parser import DocParser, DocOptions
+from luadoc.model import LuaModule
+
 
 
 class Configuration:
     @staticmethod
     def load(file_path: str):
-        with open(file_path) as json_data_file:
-            data = json.load(json_data_file)
+        with open(file_path, 'rb') as json_data_file:
+            data = json.loads(json_data_file.read())
         options = DocOptions()
         options.__dict__ = data
         return options
 
     @staticmethod
     def generate_default(file_path: str):
+        # printers are only needed to write output
+        from luadoc.printers import json_dumps
+
         with open(file_path, 'w') as json_data_file:
-            json_data_file.write(
-                json.dumps(DocOptions().__dict__,
-                           sort_keys=True,
-                           indent=4,
-                           separators=(',', ': ')))
+            json_data_file.write(json_dumps(DocOptions().__dict__, sort_keys=True))
         print('Config. file generated in: ' + os.path.abspath(file_path))
 
 
-class FilesProcessor:
-    def __init__(self, jobs, doc_options: DocOptions):
-        self._jobs = jobs
-        self._doc_options: DocOptions = doc_options
+class _CacheDir:
+    """ On-disk cache of module doc models, enabled with a cache directory.
+        Entries are keyed by the sha1 of the source content, salted with
+        the luadoc version and the doc options used to build them.
+        An entry stores the model and the diagnostics logged while parsing
+        it, they are logged again when the entry is used.
+        Nothing is evicted: the directory can be deleted at any time.
+    """
+
+    def __init__(self, path: str, doc_options: DocOptions):
+        self.path = path
+        self._salt = (__version__ + json.dumps(doc_options.__dict__, sort_keys=True)).encode()
 
-    def _process_one(self, file_path):
-        """Process one file.
+    def key(self, content: bytes) -> str:
+        return hashlib.sha1(self._salt + content).hexdigest()
+
+    def load(self, key: str):
+        """ Return a (model, diagnostics) entry, or None.
+        """
+        # noinspection PyBroadException
+        try:
+            with open(os.path.join(self.path, key + '.pkl'), 'rb') as file:
+                model, diagnostics = pickle.load(file)
+            return model, diagnostics
+        except Exception:
+            return None
+
+    def store(self, key: str, model, diagnostics) -> None:
+        """ Store an entry, the cache is best effort: errors are only logged.
         """
-        with open(file_path, encoding=self._doc_options.encoding) as file:
-            file_content = file.read()
+        # noinspection PyBroadException
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    pickle.dump((model, diagnostics), file)
+                # atomic, concurrent workers never see a partial entry
+                os.replace(tmp_path, os.path.join(self.path, key + '.pkl'))
+            except Exception:
+                os.remove(tmp_path)
+                raise
+        except Exception as exc:
+            logging.debug('cannot write cache entry %s: %s', key, exc)
+
+
+class _DiagnosticsRecorder(logging.Handler):
+    """ Record the (level, message) of the warnings and errors logged while
+        a file is parsed, to store them with its cache entry.
+    """
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.diagnostics = []
+
+    def emit(self, record):
+        self.diagnostics.append((record.levelno, record.getMessage()))
+
+
+def _read_bytes(file_path: str) -> (str, bytes, bytes):
+    """Read one file and hash its content, run in the I/O thread pool.
+    """
+    with open(file_path, 'rb') as file:
+        content = file.read()
+    return file_path, content, hashlib.sha1(content).digest()
+
+
+def _parse_bytes(doc_options: DocOptions, file_path: str, content: bytes, cache: _CacheDir = None):
+    """Parse the content of one file.
+    Defined at module level so it can be pickled and sent to worker processes.
+    """
+    if cache:
+        key = cache.key(content)
+        entry = cache.load(key)
+        if entry is not None:
+            model, diagnostics = entry
+            # diagnostics name the file the entry was built from
+            for level, message in diagnostics:
+                if model.file_path:
+                    message = message.replace(model.file_path, file_path)
+                logging.log(level, '%s', message)
+            model.file_path = file_path
+            return model
+
+    # luaparser only accepts str, decode once with the same newline
+    # translation as a text mode read, skipped for files without \r
+    source = content.decode(doc_options.encoding)
+    if b'\r' in content:
+        source = source.replace('\r\n', '\n').replace('\r', '\n')
+
+    doc_parser = DocParser(doc_options)
+    if not cache:
+        return doc_parser.build_module_doc_model(source, file_path)
+
+    recorder = _DiagnosticsRecorder()
+    logging.getLogger().addHandler(recorder)
+    try:
+        model = doc_parser.build_module_doc_model(source, file_path)
+    finally:
+        logging.getLogger().removeHandler(recorder)
+
+    cache.store(key, model, recorder.diagnostics)
+    return model
 
-        doc_parser = DocParser(self._doc_options)
 
-        return doc_parser.build_module_doc_model(file_content, file_path)
+class FilesProcessor:
+    IO_JOBS = 4  # number of threads reading files
 
-    def run(self, files):
+    def __init__(self, jobs, doc_options: DocOptions, cache_dir: str = None):
+        self._jobs = jobs
+        self._doc_options: DocOptions = doc_options
+        self._cache = _CacheDir(cache_dir, doc_options) if cache_dir else None
+
+    def run(self, files, on_result: Callable[[LuaModule], None] = None) -> List[LuaModule]:
+        """ Process files and return the list of module models.
+            Files with the same content are parsed once, their models are
+            shallow copies sharing the same nodes.
+            If on_result is provided, each model is passed to it as soon as it is
+            available and is not kept in the returned list.
+        """
         logging.info(str(len(files)) + ' file(s) to process')
 
         processed = 0
-        logging.info('[' + str(processed) + '/' + str(len(files)) + '] file(s) processed')
+        logging.info('[%d/%d] file(s) processed', processed, len(files))
+
+        # log progress about every 1% of the files
+        progress_step = max(1, len(files) // 100)
 
         # some stats
         start = time.time()
-        total_file = 0
         model = []
 
-        # We can use a with statement to ensure threads are cleaned up promptly
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self._jobs) as executor:
-            # Start process operations and mark each future with its filename
-            future_to_file = {executor.submit(self._process_one, file): file for file in files}
-            for future in concurrent.futures.as_completed(future_to_file):
-                file = future_to_file[future]
+        # files are read by a thread pool while parsing, which is CPU bound,
+        # is done by a process pool to bypass the GIL
+        with concurrent.futures.ThreadPoolExecutor(max_workers=FilesProcessor.IO_JOBS) as io_executor, \
+                concurrent.futures.ProcessPoolExecutor(max_workers=self._jobs) as executor:
+            read_future_to_file = {io_executor.submit(_read_bytes, file): file for file in files}
+
+            # submit parsing as soon as a file is read, files with the
+            # same content (vendored modules...) are parsed only once
+            future_to_files = {}
+            digest_to_files = {}
+            for read_future in concurrent.futures.as_completed(read_future_to_file):
+                # drop the read future: the parse job keeps the only reference to the content
+                file = read_future_to_file.pop(read_future)
                 try:
-                    total_file += 1
-                    model.append(future.result())
+                    file_path, content, digest = read_future.result()
                 except Exception as exc:
                     logging.error('%r generated an exception: %s' % (file, exc))
                 else:
+                    files_of_digest = digest_to_files.get(digest)
+                    if files_of_digest is None:
+                        future = executor.submit(_parse_bytes, self._doc_options, file_path, content, self._cache)
+                        future_to_files[future] = digest_to_files[digest] = [file]
+                    else:
+                        files_of_digest.append(file)
+
+            for future in concurrent.futures.as_completed(future_to_files):
+                # results are released as soon as they are handled
+                files_of_future = future_to_files.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    for file in files_of_future:
+                        logging.error('%r generated an exception: %s' % (file, exc))
+                    continue
+                del future  # it holds the result too
+
+                for i, file in enumerate(files_of_future):
+                    if i > 0:
+                        # duplicated file: share the parsed content
+                        result = copy.copy(result)
+                        result.file_path = file
+                    if on_result:
+                        on_result(result)
+                    else:
+                        model.append(result)
                     processed += 1
-                    logging.info('[' + str(processed) + '/' + str(len(files)) + '] file(s) processed, last is ' + file)
-                    sys.stdout.flush()
+                    if processed % progress_step == 0 or processed == len(files):
+                        logging.info('[%d/%d] file(s) processed, last is %s', processed, len(files), file)
+                del result  # not kept alive while waiting for the next one
 
         end = time.time()
-        logging.info(str(total_file) + ' files processed in ' + str(round(end - start, 2)) + ' s')
+        logging.info('%d/%d files processed in %.2f s', processed, len(files), end - start)
         return model
 
-    def run_for_source(self, source):
+    def run_for_source(self, source, file_path: str = ""):
         doc_parser = DocParser(self._doc_options)
 
-        model = doc_parser.build_module_doc_model(source)
+        model = doc_parser.build_module_doc_model(source, file_path)
 
         return model
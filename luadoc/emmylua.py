@@ -1,12 +1,18 @@
+import re
+import sys
+import functools
+import threading
 import luadoc.model as model
-from parsimonious.grammar import Grammar, NodeVisitor
+from luadoc.model import parse_type
+from luadoc import emmylua_rd
 from typing import List
 
 
-EMMY_LUA_TYPE_GRAMMAR = Grammar(
-    """
-    emmy_type_desc = _ emmy_type_or (_ "," _ emmy_type_or)* "@"? desc?
-    emmy_type_or   = emmy_type _ ("|" _ emmy_type _)*
+EMMY_LUA_TYPE_GRAMMAR_SRC = """
+    emmy_type_desc = _ emmy_type_opt_or emmy_type_more* "@"? desc?
+    emmy_type_more = _ "," _ emmy_type_opt_or
+    emmy_type_opt_or = emmy_type_or / (emmy_type _)
+    emmy_type_or   = emmy_type _ ("|" _ emmy_type _)+
     emmy_type      = func / table / array / type_id
 
     table          = "table" _ "<" _ emmy_type _ "," _ emmy_type _ ">" _
@@ -22,7 +28,16 @@ EMMY_LUA_TYPE_GRAMMAR = Grammar(
     id             = ~"[_a-zA-Z][_a-zA-Z0-9]*"
     desc           = ~".*"
     _              = " "*
-    """)
+    """
+
+
+@functools.lru_cache()
+def _load_grammar():
+    """ Compile the parsimonious grammar on first use.
+        It is only used by the tests (pip install luadoc[test]).
+    """
+    from parsimonious.grammar import Grammar
+    return Grammar(EMMY_LUA_TYPE_GRAMMAR_SRC)
 
 
 class FuncContext:
@@ -38,17 +53,30 @@ class EmmyLuaParser:
         self.types: List[model.LuaType] = []
         self.desc: str = ""
 
+    def reset(self):
+        """ Clear the parser state before parsing a new field.
+        """
+        self._function_stack.clear()
+        self.types.clear()
+        self.desc = ""
+
+    @classmethod
+    def _build_dispatch(cls, prefix: str):
+        """ Map grammar rule names to the prefix<rule name> methods.
+        """
+        return {name[len(prefix):]: getattr(cls, name) for name in dir(cls) if name.startswith(prefix)}
+
     def visit(self, node):
-        enter_visitor = getattr(self, "enter_" + node.expr_name, None)
+        enter_visitor = self._ENTER.get(node.expr_name)
         if enter_visitor:
-            enter_visitor(node, node.children)
+            enter_visitor(self, node, node.children)
 
         for n in node.children:
             self.visit(n)
 
-        visitor = getattr(self, "visit_" + node.expr_name, None)
+        visitor = self._VISIT.get(node.expr_name)
         if visitor:
-            visitor(node, node.children)
+            visitor(self, node, node.children)
 
     # noinspection PyUnusedLocal
     def enter_func(self, node, children):
@@ -68,7 +96,8 @@ class EmmyLuaParser:
 
     # noinspection PyUnusedLocal
     def visit_func_arg_name(self, node, children):
-        self._function_stack[-1].param_names.append(node.text.strip())
+        # func_arg_name = id _ : take the id node text, without trailing spaces
+        self._function_stack[-1].param_names.append(children[0].text)
 
     # noinspection PyUnusedLocal
     def visit_func_return(self, node, children):
@@ -76,14 +105,12 @@ class EmmyLuaParser:
 
     # noinspection PyUnusedLocal
     def visit_table(self, node, children):
-        table = model.LuaTypeDict(self.types[-2], self.types[-1])
-        self.types.pop()
-        self.types.pop()
-        self.types.append(table)
+        key_type, value_type = self.types[-2:]
+        self.types[-2:] = (model.LuaTypeDict(key_type, value_type),)
 
     # noinspection PyUnusedLocal
     def visit_array(self, node, children):
-        self.types.append(model.LuaTypeArray(self.types.pop()))
+        self.types[-1] = model.LuaTypeArray(self.types[-1])
 
     # noinspection PyUnusedLocal
     def visit_type_id(self, node, children):
@@ -91,9 +118,13 @@ class EmmyLuaParser:
 
     # noinspection PyUnusedLocal
     def visit_emmy_type_or(self, node, children):
+        # only visited if there is a "|": always more than one type
+        self.types[:] = (model.LuaTypeOr(self.types[:]),)
+
+    # noinspection PyUnusedLocal
+    def visit_emmy_type_more(self, node, children):
         if len(self.types) > 1:
-            types = model.LuaTypeOr(self.types)
-            self.types = [types]
+            self.types[:] = (model.LuaTypeOr(self.types[:]),)
 
     # noinspection PyUnusedLocal
     def visit_desc(self, node, children):
@@ -103,35 +134,62 @@ class EmmyLuaParser:
         pass
 
 
+EmmyLuaParser._ENTER = EmmyLuaParser._build_dispatch("enter_")
+EmmyLuaParser._VISIT = EmmyLuaParser._build_dispatch("visit_")
+
+
+# a type_id, optional "@" and the desc
+_SINGLE_TYPE_FIELD_RE = re.compile(r" *([_a-zA-Z][_a-zA-Z0-9]*(?:\.[_a-zA-Z][_a-zA-Z0-9]*)*) *(@?)(.*)")
+# a desc starting with one of these may be part of the type
+_NOT_SINGLE_TYPE = ("[", "|", ",", "(", "<")
+
+
+@functools.lru_cache(maxsize=8192)
 def parse_param_field(input_str: str) -> (model.LuaType, str):
     """
     Try to parse an emmy lua param field:
     param_name MY_TYPE[|other_type] [@comment]
+
+    Results are cached, returned types are shared and must not be mutated.
     """
-    parse_tree = EMMY_LUA_TYPE_GRAMMAR.parse(input_str)
-    parser = EmmyLuaParser()
-    parser.visit(parse_tree)
-    return parser.types[0], parser.desc
+    # fast path for a single type name: "MyClass [@comment]"
+    match = _SINGLE_TYPE_FIELD_RE.fullmatch(input_str)
+    if match:
+        type_id, at, desc = match.groups()
+        if at or not desc.startswith(_NOT_SINGLE_TYPE):
+            return parse_type(type_id), desc
+
+    return emmylua_rd.parse_param_field(input_str)
+
+
+@functools.lru_cache(maxsize=8192)
+def parse_param(input_str: str) -> (str, model.LuaType, str):
+    """
+    Parse the content of an emmy lua @param tag:
+    param_name MY_TYPE[|other_type] [@comment]
+
+    The same lines come back often (e.g. "self MyClass"), results are cached.
+    """
+    param_name, type_desc = input_str.split(' ', 1)
+    lua_type, desc = parse_param_field(type_desc)
+    return sys.intern(param_name), lua_type, desc
 
 
-def parse_type(type_str: str) -> model.LuaType:
-    if type_str == "nil":
-        return model.LuaTypeNil()
-    elif type_str in ["bool", "boolean"]:
-        return model.LuaTypeBoolean()
-    elif type_str in ["number", "int", "float"]:
-        return model.LuaTypeNumber()
-    elif type_str == "string":
-        return model.LuaTypeString()
-    elif type_str in ["function", "func", "fun"]:
-        return model.LuaTypeFunction()
-    elif type_str == "userdate":
-        return model.LuaTypeUserdata()
-    elif type_str == "thread":
-        return model.LuaTypeThread()
-    elif type_str == ["table", "tab"]:
-        return model.LuaTypeTable()
-    elif type_str == "any":
-        return model.LuaTypeAny()
+# one EmmyLuaParser per thread, reset between fields
+_thread_local = threading.local()
+
+
+def parse_param_field_peg(input_str: str) -> (model.LuaType, str):
+    """
+    Parse an emmy lua param field with parsimonious and the grammar of _load_grammar().
+
+    Reference implementation the tests check emmylua_rd against.
+    """
+    parse_tree = _load_grammar().parse(input_str)
+    parser = getattr(_thread_local, "parser", None)
+    if parser is None:
+        parser = _thread_local.parser = EmmyLuaParser()
     else:
-        return model.LuaTypeCustom(type_str)
+        parser.reset()
+    parser.visit(parse_tree)
+    return parser.types[0], parser.desc
@@ -0,0 +1,255 @@
+"""
+Hand written recursive descent parser for emmy lua types.
+
+It implements the same language as EMMY_LUA_TYPE_GRAMMAR_SRC (see emmylua.py)
+and builds the model.Lua* nodes directly, without building a parse tree.
+"""
+import re
+import luadoc.model as model
+from luadoc.model import parse_type
+from typing import List
+
+
+class EmmyLuaSyntaxError(Exception):
+    pass
+
+
+class EmmyLuaTypeParser:
+    """ Parse one emmy lua type string.
+
+        Each parse_* method returns the parsed value, or None after restoring
+        the position if the rule does not match (like a PEG ordered choice).
+    """
+
+    ID_RE = re.compile(r"[_a-zA-Z][_a-zA-Z0-9]*")
+    TYPE_ID_RE = re.compile(r"[_a-zA-Z][_a-zA-Z0-9]*(?:\.[_a-zA-Z][_a-zA-Z0-9]*)*")
+
+    def __init__(self, src: str):
+        self.src: str = src
+        self.pos: int = 0
+
+    def parse_type_desc(self) -> (model.LuaType, str):
+        """
+        emmy_type_desc = _ emmy_type_opt_or emmy_type_more* "@"? desc?
+        emmy_type_more = _ "," _ emmy_type_opt_or
+        """
+        self.skip_ws()
+        types: List[model.LuaType] = []
+        if not self.parse_type_or(types):
+            raise EmmyLuaSyntaxError("invalid emmy lua type: " + self.src)
+
+        while True:
+            start = self.pos
+            self.skip_ws()
+            if self.accept(","):
+                self.skip_ws()
+                if self.parse_type_or(types):
+                    continue
+            self.pos = start
+            break
+
+        self.accept("@")
+
+        desc = self.src[self.pos:]
+        if "\n" in desc:
+            raise EmmyLuaSyntaxError("invalid emmy lua type: " + self.src)
+        return types[0], desc
+
+    def parse_type_or(self, types: List[model.LuaType]) -> bool:
+        """
+        emmy_type_opt_or = emmy_type_or / (emmy_type _)
+        emmy_type_or     = emmy_type _ ("|" _ emmy_type _)+
+
+        Parsed types are pushed on types, which is folded into a
+        LuaTypeOr if it contains more than one type.
+        """
+        lua_type = self.parse_type()
+        if lua_type is None:
+            return False
+        types.append(lua_type)
+        self.skip_ws()
+
+        while True:
+            start = self.pos
+            if self.accept("|"):
+                self.skip_ws()
+                lua_type = self.parse_type()
+                if lua_type is not None:
+                    types.append(lua_type)
+                    self.skip_ws()
+                    continue
+            self.pos = start
+            break
+
+        if len(types) > 1:
+            types[:] = [model.LuaTypeOr(list(types))]
+        return True
+
+    def parse_type(self) -> model.LuaType or None:
+        """
+        emmy_type = func / table / array / type_id
+        """
+        # peek the first character to only try the rule that can match,
+        # "fun" and "table" can also start a type_id
+        first = self.src[self.pos:self.pos + 1]
+        lua_type = None
+        if first == "f":
+            lua_type = self.parse_func()
+        elif first == "t":
+            lua_type = self.parse_table()
+        if lua_type is None:
+            lua_type = self.parse_type_id()
+            if lua_type is not None:
+                lua_type = self.parse_array_suffix(lua_type)
+        return lua_type
+
+    def parse_table(self) -> model.LuaTypeDict or None:
+        """
+        table = "table" _ "<" _ emmy_type _ "," _ emmy_type _ ">" _
+        """
+        start = self.pos
+        if self.accept_keyword("table", "<"):
+            key_type = self.parse_type()
+            if key_type is not None:
+                self.skip_ws()
+                if self.accept(","):
+                    self.skip_ws()
+                    value_type = self.parse_type()
+                    if value_type is not None:
+                        self.skip_ws()
+                        if self.accept(">"):
+                            self.skip_ws()
+                            return model.LuaTypeDict(key_type, value_type)
+        self.pos = start
+        return None
+
+    def parse_array_suffix(self, lua_type: model.LuaType) -> model.LuaType:
+        """
+        array = type_id _ "[]"
+        """
+        start = self.pos
+        self.skip_ws()
+        if self.accept("[]"):
+            return model.LuaTypeArray(lua_type)
+        self.pos = start
+        return lua_type
+
+    def parse_func(self) -> model.LuaTypeCallable or None:
+        """
+        func        = "fun" _ "(" _ func_args? _ ")" _ func_return?
+        func_return = ":" _ emmy_type
+        func_args   = func_arg (_ "," _ func_arg _)*
+        """
+        start = self.pos
+        if not self.accept_keyword("fun", "("):
+            return None
+
+        arg_types: List[model.LuaType] = []
+        arg_names: List[str] = []
+        if self.parse_func_arg(arg_types, arg_names):
+            while True:
+                arg_start = self.pos
+                self.skip_ws()
+                if self.accept(","):
+                    self.skip_ws()
+                    if self.parse_func_arg(arg_types, arg_names):
+                        self.skip_ws()
+                        continue
+                self.pos = arg_start
+                break
+
+        self.skip_ws()
+        if not self.accept(")"):
+            self.pos = start
+            return None
+        self.skip_ws()
+
+        return_types: List[model.LuaType] = []
+        return_start = self.pos
+        if self.accept(":"):
+            self.skip_ws()
+            return_type = self.parse_type()
+            if return_type is not None:
+                return_types.append(return_type)
+            else:
+                self.pos = return_start
+
+        return model.LuaTypeCallable(arg_types=arg_types,
+                                     return_types=return_types,
+                                     arg_names=arg_names)
+
+    def parse_func_arg(self, arg_types: List[model.LuaType], arg_names: List[str]) -> bool:
+        """
+        func_arg      = func_arg_name ":" _ emmy_type
+        func_arg_name = id _
+        """
+        start = self.pos
+        name = self.parse_id()
+        if name is not None:
+            self.skip_ws()
+            if self.accept(":"):
+                self.skip_ws()
+                lua_type = self.parse_type()
+                if lua_type is not None:
+                    arg_names.append(name)
+                    arg_types.append(lua_type)
+                    return True
+        self.pos = start
+        return False
+
+    def parse_id(self) -> str or None:
+        """
+        id = ~"[_a-zA-Z][_a-zA-Z0-9]*"
+        """
+        match = EmmyLuaTypeParser.ID_RE.match(self.src, self.pos)
+        if match:
+            self.pos = match.end()
+            return match.group()
+        return None
+
+    def parse_type_id(self) -> model.LuaType or None:
+        """
+        type_id = id ("." id)*
+        """
+        match = EmmyLuaTypeParser.TYPE_ID_RE.match(self.src, self.pos)
+        if match:
+            self.pos = match.end()
+            return parse_type(match.group())
+        return None
+
+    def accept(self, token: str) -> bool:
+        if self.src.startswith(token, self.pos):
+            self.pos += len(token)
+            return True
+        return False
+
+    def accept_keyword(self, keyword: str, opening: str) -> bool:
+        """
+        keyword _ opening _
+        """
+        start = self.pos
+        if self.accept(keyword):
+            self.skip_ws()
+            if self.accept(opening):
+                self.skip_ws()
+                return True
+        self.pos = start
+        return False
+
+    def skip_ws(self) -> None:
+        """
+        _ = " "*
+        """
+        src = self.src
+        pos = self.pos
+        while pos < len(src) and src[pos] == " ":
+            pos += 1
+        self.pos = pos
+
+
+def parse_param_field(input_str: str) -> (model.LuaType, str):
+    """
+    Parse an emmy lua param field:
+    MY_TYPE[|other_type] [@comment]
+    """
+    return EmmyLuaTypeParser(input_str).parse_type_desc()
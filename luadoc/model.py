@@ -1,10 +1,33 @@
-from typing import List, TypeVar
+import functools
+from typing import List
 from enum import Enum
 import luaparser.astnodes as nodes
 
 
 class LuaNode:
-    pass
+    """ Base class of the doc model nodes.
+        Nodes declare their attributes in __slots__, in the order they are
+        set by __init__ (the order of the serialized attributes).
+    """
+    __slots__ = ()
+    _FIELDS = ()  # slots of the class and its bases, base classes first
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._FIELDS = cls.__base__._FIELDS + tuple(cls.__dict__.get("__slots__", ()))
+
+    def to_dict(self) -> dict:
+        """ Return the node attributes in declaration order.
+        """
+        attrs = {}
+        for name in self._FIELDS:
+            try:
+                attrs[name] = getattr(self, name)
+            except AttributeError:  # slot never set
+                pass
+        # subclasses without __slots__
+        attrs.update(getattr(self, "__dict__", ()))
+        return attrs
 
 
 class LuaTypes:
@@ -20,19 +43,6 @@ class LuaTypes:
     USERDATA = 9
 
 
-LuaTypes_str = dict([
-    (LuaTypes.UNKNOWN, "unknown"),
-    (LuaTypes.STRING, "string"),
-    (LuaTypes.NUMBER, "number"),
-    (LuaTypes.INTEGER, "int"),
-    (LuaTypes.FLOAT, "float"),
-    (LuaTypes.BOOLEAN, "bool"),
-    (LuaTypes.FUNCTION, "func"),
-    (LuaTypes.TABLE, "table"),
-    (LuaTypes.USERDATA, "userdata")
-])
-
-
 class LuaVisibility(str, Enum):
     PUBLIC = "public"
     PROTECTED = "protected"
@@ -47,68 +57,97 @@ LuaVisibility_from_str = dict([
 
 
 class LuaType(LuaNode):
+    __slots__ = ("id",)
+
     def __init__(self, name: str):
         self.id = name
 
 
-class LuaTypeNil(LuaType):
-    def __init__(self):
-        LuaType.__init__(self, "nil")
+class LuaTypePrimitive(LuaType):
+    """ Base class of the types without payload.
+        Each subclass has a single instance, created on first call. These
+        instances are shared (e.g. LuaTypeAny() default arguments) and must
+        not be mutated.
+    """
+    __slots__ = ()
+    ID = ""
 
+    def __new__(cls):
+        instance = cls.__dict__.get("_instance")
+        if instance is None:
+            instance = LuaType.__new__(cls)
+            LuaType.__init__(instance, cls.ID)
+            cls._instance = instance
+        return instance
 
-class LuaTypeBoolean(LuaType):
     def __init__(self):
-        LuaType.__init__(self, "boolean")
+        pass
 
 
-class LuaTypeNumber(LuaType):
-    def __init__(self):
-        LuaType.__init__(self, "number")
+class LuaTypeNil(LuaTypePrimitive):
+    __slots__ = ()
+    ID = "nil"
 
 
-class LuaTypeString(LuaType):
-    def __init__(self):
-        LuaType.__init__(self, "string")
+class LuaTypeBoolean(LuaTypePrimitive):
+    __slots__ = ()
+    ID = "boolean"
 
 
-class LuaTypeFunction(LuaType):
-    def __init__(self):
-        LuaType.__init__(self, "function")
+class LuaTypeNumber(LuaTypePrimitive):
+    __slots__ = ()
+    ID = "number"
 
 
-class LuaTypeUserdata(LuaType):
-    def __init__(self):
-        LuaType.__init__(self, "userdata")
+class LuaTypeString(LuaTypePrimitive):
+    __slots__ = ()
+    ID = "string"
 
 
-class LuaTypeThread(LuaType):
-    def __init__(self):
-        LuaType.__init__(self, "thread")
+class LuaTypeFunction(LuaTypePrimitive):
+    __slots__ = ()
+    ID = "function"
 
 
-class LuaTypeTable(LuaType):
-    def __init__(self):
-        LuaType.__init__(self, "table")
+class LuaTypeUserdata(LuaTypePrimitive):
+    __slots__ = ()
+    ID = "userdata"
 
 
-class LuaTypeAny(LuaType):
-    def __init__(self):
-        LuaType.__init__(self, "any")
+class LuaTypeThread(LuaTypePrimitive):
+    __slots__ = ()
+    ID = "thread"
+
+
+class LuaTypeTable(LuaTypePrimitive):
+    __slots__ = ()
+    ID = "table"
+
+
+class LuaTypeAny(LuaTypePrimitive):
+    __slots__ = ()
+    ID = "any"
 
 
 class LuaTypeArray(LuaType):
+    __slots__ = ("type",)
+
     def __init__(self, lua_type: LuaType):
         LuaType.__init__(self, "array")
         self.type = lua_type
 
 
 class LuaTypeCustom(LuaType):
+    __slots__ = ("name",)
+
     def __init__(self, name: str):
         LuaType.__init__(self, "custom")
         self.name = name
 
 
 class LuaTypeDict(LuaType):
+    __slots__ = ("key_type", "value_type")
+
     def __init__(self, key_type: LuaType, value_type: LuaType):
         LuaType.__init__(self, "dict")
         self.key_type = key_type
@@ -116,6 +155,8 @@ class LuaTypeDict(LuaType):
 
 
 class LuaTypeCallable(LuaType):
+    __slots__ = ("arg_types", "arg_names", "return_types")
+
     def __init__(self, arg_types: List[LuaType], return_types: List[LuaType], arg_names: List[str] = None):
         LuaType.__init__(self, "callable")
         self.arg_types = arg_types
@@ -135,13 +176,45 @@ class LuaTypeOr(LuaType):
     Represent a list of possible types.
     e.g: number | string
     """
+    __slots__ = ("types",)
 
     def __init__(self, lua_types: List[LuaType]):
         LuaType.__init__(self, "or")
         self.types = lua_types
 
 
+_PRIMITIVE_TYPES = {
+    "nil": LuaTypeNil(),
+    "bool": LuaTypeBoolean(),
+    "boolean": LuaTypeBoolean(),
+    "number": LuaTypeNumber(),
+    "int": LuaTypeNumber(),
+    "float": LuaTypeNumber(),
+    "string": LuaTypeString(),
+    "function": LuaTypeFunction(),
+    "func": LuaTypeFunction(),
+    "fun": LuaTypeFunction(),
+    "userdate": LuaTypeUserdata(),
+    "thread": LuaTypeThread(),
+    "table": LuaTypeTable(),
+    "tab": LuaTypeTable(),
+    "any": LuaTypeAny(),
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_type(type_str: str) -> LuaType:
+    """
+    Get the type of a type name (emmy lua and ldoc share them).
+    Returned types are shared and must not be mutated.
+    """
+    lua_type = _PRIMITIVE_TYPES.get(type_str)
+    return lua_type if lua_type is not None else LuaTypeCustom(type_str)
+
+
 class LuaParam(LuaNode):
+    __slots__ = ("name", "desc", "type", "is_opt", "default_value")
+
     def __init__(self, name: str, desc: str,
                  lua_type: LuaType = LuaTypeAny(),
                  is_opt: bool = False):
@@ -153,14 +226,17 @@ class LuaParam(LuaNode):
 
 
 class LuaReturn(LuaNode):
+    __slots__ = ("desc", "type")
+
     def __init__(self, desc: str, lua_type: LuaType = LuaTypeAny()):
         self.desc = desc
         self.type = lua_type
 
 
 class LuaSourceNode(LuaNode):
+    __slots__ = ("start_char", "stop_char")
+
     def __init__(self):
-        LuaNode.__init__(self)
         self.start_char: int = 0  # character offset
         self.stop_char: int = 0  # character offset
 
@@ -171,6 +247,9 @@ class LuaSourceNode(LuaNode):
 
 
 class LuaFunction(LuaSourceNode):
+    __slots__ = ("name", "short_desc", "desc", "params", "returns", "usage",
+                 "is_virtual", "is_abstract", "is_deprecated", "is_static", "visibility")
+
     def __init__(self, name: str, short_desc: str = '', desc: str = '', params=None, returns=None):
         LuaSourceNode.__init__(self)
 
@@ -193,6 +272,8 @@ class LuaFunction(LuaSourceNode):
 
 
 class LuaClassField(LuaNode):
+    __slots__ = ("name", "desc", "type", "visibility")
+
     def __init__(self, name: str, desc: str,
                  lua_type: LuaType = LuaTypeAny(),
                  visibility: LuaVisibility = LuaVisibility.PUBLIC):
@@ -203,8 +284,9 @@ class LuaClassField(LuaNode):
 
 
 class LuaClass(LuaNode):
+    __slots__ = ("name", "name_in_source", "methods", "short_desc", "desc", "usage", "inherits_from", "fields")
+
     def __init__(self, name: str = 'unknown', name_in_source: str = ''):
-        LuaNode.__init__(self)
         self.name: str = name
         self.name_in_source: str = name_in_source
         self.methods: List[LuaFunction] = []
@@ -216,8 +298,9 @@ class LuaClass(LuaNode):
 
 
 class LuaModule(LuaNode):
+    __slots__ = ("file_path", "classes", "functions", "data", "name", "is_class_mod", "short_desc", "desc", "usage")
+
     def __init__(self, name: str):
-        LuaNode.__init__(self)
         # list of LuaStatement
         self.file_path: str = ""
         self.classes: List[LuaTypeCallable] = []
@@ -231,6 +314,8 @@ class LuaModule(LuaNode):
 
 
 class LuaData(LuaNode):
+    __slots__ = ("name", "short_desc", "desc", "visibility", "constant")
+
     def __init__(self, name: str):
         self.name: str = name
         self.short_desc: str = ""
@@ -240,6 +325,8 @@ class LuaData(LuaNode):
 
 
 class LuaDictField(LuaData):
+    __slots__ = ()
+
     def __init__(self, name: str, desc: str):
         LuaData.__init__(self, name)
         self.name: str = name
@@ -247,6 +334,8 @@ class LuaDictField(LuaData):
 
 
 class LuaDict(LuaData):
+    __slots__ = ("fields",)
+
     def __init__(self, name: str, desc: str):
         LuaData.__init__(self, name)
         self.desc: str = desc
@@ -254,11 +343,13 @@ class LuaDict(LuaData):
 
     def to_json(self):
         return {
-            "table": self.__dict__
+            "table": self.to_dict()
         }
 
 
 class LuaValue(LuaData):
+    __slots__ = ("type", "value")
+
     def __init__(self, name: str, lua_type: LuaType):
         LuaData.__init__(self, name)
         self.type = lua_type
@@ -266,34 +357,29 @@ class LuaValue(LuaData):
 
     def to_json(self):
         return {
-            "value": self.__dict__
+            "value": self.to_dict()
         }
 
 
 class LuaQualifier:
-    pass
+    __slots__ = ()
 
 
 class LuaVirtualQualifier(LuaQualifier):
-    def __init__(self):
-        LuaQualifier.__init__(self)
+    __slots__ = ()
 
 
 class LuaAbstractQualifier(LuaQualifier):
-    def __init__(self):
-        LuaQualifier.__init__(self)
+    __slots__ = ()
 
 
 class LuaDeprecatedQualifier(LuaQualifier):
-    def __init__(self):
-        LuaQualifier.__init__(self)
+    __slots__ = ()
 
 
 class LuaPrivateQualifier(LuaQualifier):
-    def __init__(self):
-        LuaQualifier.__init__(self)
+    __slots__ = ()
 
 
 class LuaProtectedQualifier(LuaQualifier):
-    def __init__(self):
-        LuaQualifier.__init__(self)
+    __slots__ = ()
@@ -1,9 +1,12 @@
+import io
 import re
+import sys
+import functools
 import logging
 from luaparser import ast
 from luaparser.astnodes import *
 from luadoc.model import *
-from typing import List, Dict, cast, Callable
+from typing import List, Dict, Set, Optional, Pattern, Callable
 import luadoc.emmylua as emmylua
 import luadoc.luadoc as luadoc
 import luadoc.astutils as astutils
@@ -24,6 +27,11 @@ class SyntaxException(Exception):
 # some custom types
 DocTagHandler = Dict[str, Callable[[str, Node], LuaNode or None]]
 
+# pending function qualifier flags
+QUALIFIER_VIRTUAL = 1
+QUALIFIER_ABSTRACT = 2
+QUALIFIER_DEPRECATED = 4
+
 
 class LuaDocParser:
     """ Lua doc style parser
@@ -37,6 +45,7 @@ class LuaDocParser:
 
     def __init__(self, options: DocOptions, file_path: str):
         self._start_symbol: str = options.comment_prefix
+        self._strip_chars: str = self._start_symbol + " "  # stripped before tags and strings
         self.file_path = file_path
 
         # list of string with no tag
@@ -44,13 +53,14 @@ class LuaDocParser:
         self._pending_param: List[LuaParam] = []
         self._pending_return: List[LuaReturn] = []
         self._pending_function: List[LuaFunction] = []
-        self._pending_qualifiers: List[LuaQualifier] = []  # @virtual, @abstract, @deprecated
+        self._pending_qualifiers: int = 0  # QUALIFIER_* flags: @virtual, @abstract, @deprecated
+        self._pending_visibility: Optional[LuaVisibility] = None  # @private, @protected
         self._pending_class: List[LuaClass] = []
         self._pending_module: List[LuaModule] = []
         self._pending_overload: List[LuaTypeCallable] = []
         self._pending_data: List[LuaData] = []
         self._usage_in_progress: bool = False
-        self._usage_str: List[str] = []
+        self._usage_str: io.StringIO = io.StringIO()  # one '\n' terminated line per usage line
         self._exported: bool = False  # comment contains an @export tag ?
         self._constant: bool = False  # is the expression constant ?
         self._namespace: str = ""  # put into namespace ?
@@ -83,21 +93,8 @@ class LuaDocParser:
         }
 
         # some regex handler that will be tested after _handlers
-        self._re_handler: DocTagHandler = {
-            r'^@tparam\[opt(?:\s*=\s*([^\].]*))?\]': self._parse_tparam_opt_re
-        }
-
-        self._param_type_str_to_lua_types = {
-            'string': LuaTypes.STRING,
-            'number': LuaTypes.NUMBER,
-            'int': LuaTypes.INTEGER,
-            'float': LuaTypes.FLOAT,
-            'bool': LuaTypes.BOOLEAN,
-            'boolean': LuaTypes.BOOLEAN,
-            'function': LuaTypes.FUNCTION,
-            'func': LuaTypes.FUNCTION,
-            'tab': LuaTypes.TABLE,
-            'table': LuaTypes.TABLE,
+        self._re_handler: Dict[Pattern, Callable] = {
+            re.compile(r'^@tparam\[opt(?:\s*=\s*([^\].]*))?\]'): self._parse_tparam_opt_re
         }
 
     def _get_short_desc_and_desc(self) -> (str, str):
@@ -108,33 +105,66 @@ class LuaDocParser:
         long_desc = '\n'.join(self._pending_str)
         return short_desc, long_desc
 
+    def _get_usage(self) -> str:
+        # drop the last line terminator, like a '\n'.join of the lines would
+        return self._usage_str.getvalue()[:-1]
+
     def parse_comments(self, ast_node: Node):
-        comments = [c.s for c in ast_node.comments]
+        # most ast nodes have no comment: nothing can be pending
+        if not ast_node.comments:
+            return [], []
 
-        # reset pending list
+        # reset pending state, buffers are reused except _pending_str (handed to
+        # the caller) and _pending_return (becomes a LuaFunction.returns)
         self._pending_str = []
-        self._pending_param = []
-        self._pending_function = []
+        self._pending_param.clear()
+        self._pending_function.clear()
         self._pending_return = []
-        self._pending_qualifiers = []
-        self._pending_class = []
-        self._pending_module = []
+        self._pending_qualifiers = 0
+        self._pending_visibility = None
+        self._pending_class.clear()
+        self._pending_module.clear()
         self._usage_in_progress = False
-        self._usage_str = []
-        self._pending_overload = []
-        self._pending_data = []
+        self._usage_str.seek(0)
+        self._usage_str.truncate()
+        self._pending_overload.clear()
+        self._pending_data.clear()
         self._exported = False
         self._constant = False
 
         doc_nodes: List[LuaNode] = []
-        for comment in comments:
-            node = self._parse_comment(comment, ast_node)
-            if node is not None:
-                doc_nodes.append(node)
+        start_symbol = self._start_symbol
+        strip_chars = self._strip_chars
+        handlers = self._handlers
+        pending_str = self._pending_str
+        for comment in ast_node.comments:
+            comment = comment.s
+            if not comment.startswith(start_symbol):
+                continue
+            text = comment.lstrip(strip_chars)
+            if text.startswith('@'):
+                tag, _, params = text.partition(' ')
+                params = params.strip()
+                handler = handlers.get(tag)
+                if handler:
+                    node = handler(params, ast_node)
+                    if node is not None:
+                        doc_nodes.append(node)
+                else:
+                    for regex, re_handler in self._re_handler.items():
+                        m = regex.match(tag)
+                        if m:
+                            re_handler(params, ast_node, m)
+            elif not self._usage_in_progress:  # set by the @usage handler
+                # its just a string
+                pending_str.append(text)
+            else:
+                usage_str = self._usage_str
+                usage_str.write(comment[len(start_symbol) + 1:])
+                usage_str.write('\n')
 
         if self._exported:
-            if (isinstance(ast_node, LocalFunction) or
-                isinstance(ast_node, Function)) and not self._pending_function:
+            if isinstance(ast_node, (LocalFunction, Function)) and not self._pending_function:
                 function_name = astutils.get_identifier(ast_node)
                 short_desc, desc = self._get_short_desc_and_desc()
                 func = LuaFunction(name=function_name, short_desc=short_desc, desc=desc).init(ast_node)
@@ -159,7 +189,7 @@ class LuaDocParser:
             short_desc, long_desc = self._get_short_desc_and_desc()
             lua_class.short_desc = short_desc
             lua_class.desc = long_desc
-            lua_class.usage = '\n'.join(self._usage_str)
+            lua_class.usage = self._get_usage()
 
         if self._pending_function and self._pending_str:
             short_desc, long_desc = self._get_short_desc_and_desc()
@@ -167,42 +197,35 @@ class LuaDocParser:
             self._pending_function[-1].desc = long_desc
 
         # handle pending doc_nodes
-        if self._pending_param or self._pending_return or self._pending_qualifiers:
-            # methods
-            if type(ast_node) == Method:
-                short_desc, long_desc = self._get_short_desc_and_desc()
-                doc_nodes.append(LuaFunction('', short_desc, long_desc, [], self._pending_return).init(ast_node))
-
-            # Detect static method: a Function with an Index as name
-            if type(ast_node) == Function:
+        if self._pending_param or self._pending_return or self._pending_qualifiers or self._pending_visibility:
+            # methods, and static methods: a Function with an Index as name
+            if type(ast_node) in (Method, Function):
                 short_desc, long_desc = self._get_short_desc_and_desc()
                 doc_nodes.append(LuaFunction('', short_desc, long_desc, [], self._pending_return).init(ast_node))
 
         # handle function pending elements
         if doc_nodes and type(doc_nodes[-1]) is LuaFunction:
-            func: LuaFunction = cast(LuaFunction, doc_nodes[-1])
+            func: LuaFunction = doc_nodes[-1]
 
             # handle pending qualifiers
-            if self._pending_qualifiers:
-                for qualifier in self._pending_qualifiers:
-                    if type(qualifier) is LuaVirtualQualifier:
-                        cast(LuaVirtualQualifier, doc_nodes[-1]).is_virtual = True
-                    elif type(qualifier) is LuaAbstractQualifier:
-                        cast(LuaAbstractQualifier, doc_nodes[-1]).is_abstract = True
-                    elif type(qualifier) is LuaDeprecatedQualifier:
-                        cast(LuaDeprecatedQualifier, doc_nodes[-1]).is_deprecated = True
-                    elif type(qualifier) is LuaPrivateQualifier:
-                        func.visibility = LuaVisibility.PRIVATE
-                    elif type(qualifier) is LuaProtectedQualifier:
-                        func.visibility = LuaVisibility.PROTECTED
+            qualifiers = self._pending_qualifiers
+            if qualifiers:
+                if qualifiers & QUALIFIER_VIRTUAL:
+                    func.is_virtual = True
+                if qualifiers & QUALIFIER_ABSTRACT:
+                    func.is_abstract = True
+                if qualifiers & QUALIFIER_DEPRECATED:
+                    func.is_deprecated = True
+            if self._pending_visibility:
+                func.visibility = self._pending_visibility
 
             # handle pending usage
             if self._usage_in_progress:
-                func.usage = '\n'.join(self._usage_str)
+                func.usage = self._get_usage()
 
             if self._pending_param:
                 func.params.extend(self._pending_param)
-                self._pending_param = []
+                self._pending_param.clear()
 
             for overload in self._pending_overload:
                 doc_nodes.append(self._create_function_overload(func, overload))
@@ -210,8 +233,8 @@ class LuaDocParser:
         # handle module pending elements
         if self._pending_module:
             lua_module: LuaModule = self._pending_module[-1]
-            if self._usage_str:
-                lua_module.usage = '\n'.join(self._usage_str)
+            if self._usage_str.tell():
+                lua_module.usage = self._get_usage()
             short_desc, desc = self._get_short_desc_and_desc()
             lua_module.short_desc = short_desc
             lua_module.desc = desc
@@ -244,40 +267,21 @@ class LuaDocParser:
 
         return overload
 
-    def _parse_comment(self, comment: str, ast_node: Node):
-        if comment.startswith(self._start_symbol):
-            text = comment.lstrip(self._start_symbol + " ")
-            parts = text.split(" ", 1)
-            if parts:
-                if parts[0].startswith('@'):
-                    if parts[0] in self._handlers:
-                        return self._handlers[parts[0]](parts[1].strip() if len(parts) > 1 else "", ast_node)
-                    else:
-                        for regex, re_handler in self._re_handler.items():
-                            m = re.match(regex, parts[0])
-                            if m:
-                                re_handler(parts[1].strip() if len(parts) > 1 else "", ast_node, m)
-                elif not self._usage_in_progress:
-                    # its just a string
-                    self._pending_str.append(text)
-                else:
-                    self._usage_str.append(comment[len(self._start_symbol) + 1:])
-        return None
-
     # noinspection PyUnusedLocal
     def _parse_class(self, params: str, ast_node: Node):
         """
         --@class MY_TYPE[:PARENT_TYPE] [@comment]
         """
-        match = LuaDocParser.DOC_CLASS_RE.search(params)
+        match = LuaDocParser.DOC_CLASS_RE.match(params)
 
         if match:
             main_class, raw_bases, desc = match.groups()
 
+            main_class = sys.intern(main_class)
             main_class = LuaClass(main_class, main_class)
 
             if raw_bases:  # has base class
-                bases = [x.strip() for x in raw_bases.split(',')]
+                bases = [sys.intern(x.strip()) for x in raw_bases.split(',')]
                 main_class.inherits_from = bases
 
             self._pending_class.append(main_class)
@@ -319,7 +323,7 @@ class LuaDocParser:
         module.desc = '\n'.join(self._pending_str)
 
         if self._usage_in_progress:
-            module.usage = '\n'.join(self._usage_str)
+            module.usage = self._get_usage()
             self._usage_in_progress = False
 
         self._pending_module.append(module)
@@ -333,19 +337,19 @@ class LuaDocParser:
 
     # noinspection PyMethodMayBeStatic
     def _parse_visibility(self, string: str) -> LuaVisibility:
-        if string in LuaVisibility_from_str:
-            return LuaVisibility_from_str[string]
-        else:
+        visibility = LuaVisibility_from_str.get(string)
+        if visibility is None:
             raise ValueError("invalid visibility string " + string)
+        return visibility
 
     # noinspection PyUnusedLocal
     def _parse_tparam(self, params: str, ast_node: Node, is_opt: bool = False, default_value: str = ""):
-        parts = params.split()
+        parts = params.split(maxsplit=2)  # type, name and description
 
         if len(parts) > 2:
             lua_type = luadoc.parse_type(parts[0])
-            name = parts[1]
-            desc = ' '.join(parts[2:])
+            name = sys.intern(parts[1])
+            desc = parts[2]
 
             param = LuaParam(name, desc, lua_type, is_opt)
             param.default_value = default_value
@@ -364,9 +368,9 @@ class LuaDocParser:
 
     # noinspection PyUnusedLocal
     def _parse_param(self, params: str, ast_node: Node):
-        parts = params.split()
+        parts = params.split(maxsplit=1)  # name and description
         if len(parts) > 1:
-            param = LuaParam(parts[0], ' '.join(parts[1:]))
+            param = LuaParam(sys.intern(parts[0]), parts[1])
             # if function pending, add param to it
             if self._pending_function:
                 self._pending_function[-1].params.append(param)
@@ -382,10 +386,7 @@ class LuaDocParser:
         """
         # noinspection PyBroadException
         try:
-            parts = params.split(' ', 1)
-            param_name = parts[0]
-            params = parts[1]
-            doc_type, desc = emmylua.parse_param_field(params)
+            param_name, doc_type, desc = emmylua.parse_param(params)
             param = LuaParam(param_name, desc, doc_type)
             # if function pending, add param to it
             if self._pending_function:
@@ -403,11 +404,11 @@ class LuaDocParser:
 
     # noinspection PyUnusedLocal
     def _parse_treturn(self, params: str, ast_node: Node):
-        parts = params.split()
+        parts = params.split(maxsplit=1)  # type and description
 
         if len(parts) >= 2:
             lua_type = luadoc.parse_type(parts[0])
-            desc = ' '.join(parts[1:])
+            desc = parts[1]
 
             param = LuaReturn(desc, lua_type)
 
@@ -438,10 +439,10 @@ class LuaDocParser:
 
     # noinspection PyUnusedLocal
     def _parse_return(self, params: str, ast_node: Node):
-        parts = params.split()
+        parts = params.split(maxsplit=1)
 
         if len(parts) > 1:
-            desc = ' '.join(parts[0:])
+            desc = params
 
             param = LuaReturn(desc)
 
@@ -473,7 +474,7 @@ class LuaDocParser:
         if self._pending_function:
             self._pending_function[-1].is_virtual = True
         else:
-            self._pending_qualifiers.append(LuaVirtualQualifier())
+            self._pending_qualifiers |= QUALIFIER_VIRTUAL
 
     # noinspection PyUnusedLocal
     def _parse_varargs(self, params: str, ast_node: Node):
@@ -495,14 +496,14 @@ class LuaDocParser:
         if self._pending_function:
             self._pending_function[-1].is_abstract = True
         else:
-            self._pending_qualifiers.append(LuaAbstractQualifier())
+            self._pending_qualifiers |= QUALIFIER_ABSTRACT
 
     # noinspection PyUnusedLocal
     def _parse_deprecated(self, params: str, ast_node: Node):
         if self._pending_function:
             self._pending_function[-1].is_deprecated = True
         else:
-            self._pending_qualifiers.append(LuaDeprecatedQualifier())
+            self._pending_qualifiers |= QUALIFIER_DEPRECATED
 
     # noinspection PyUnusedLocal
     def _parse_export(self, params: str, ast_node: Node):
@@ -531,7 +532,7 @@ class LuaDocParser:
                 field_type_desc: str = " ".join(parts[1:])
 
             doc_type, desc = emmylua.parse_param_field(field_type_desc)
-            field = LuaClassField(name=field_name,
+            field = LuaClassField(name=sys.intern(field_name),
                                   desc=desc,
                                   lua_type=doc_type,
                                   visibility=field_visibility)
@@ -548,7 +549,7 @@ class LuaDocParser:
         """ Function name can describe a method or a static method on a class.
             For example: getSpeed, Car:getSpeed, Car.getMaxSpeed
         """
-        match = LuaDocParser.FUNCTION_RE.search(params)
+        match = LuaDocParser.FUNCTION_RE.match(params)
         short_desc, long_desc = self._get_short_desc_and_desc()
 
         if match is None:  # empty function name
@@ -574,14 +575,14 @@ class LuaDocParser:
         if self._pending_function:
             self._pending_function[-1].visibility = LuaVisibility.PRIVATE
         else:
-            self._pending_qualifiers.append(LuaPrivateQualifier())
+            self._pending_visibility = LuaVisibility.PRIVATE
 
     # noinspection PyUnusedLocal
     def _parse_protected(self, params: str, ast_node: Node):
         if self._pending_function:
             self._pending_function[-1].visibility = LuaVisibility.PROTECTED
         else:
-            self._pending_qualifiers.append(LuaProtectedQualifier())
+            self._pending_visibility = LuaVisibility.PROTECTED
 
     def _report_error(self, ast_node: Node, message: str, *args, **kargs):
         report_error(self.file_path, ast_node, message, *args, **kargs)
@@ -604,6 +605,18 @@ def get_ast_node_line(ast_node: Node, file_path: str):
     return line_number
 
 
+@functools.lru_cache(maxsize=256)
+def get_lua_syntax_error(src: str) -> Optional[str]:
+    """ Parse src with luaparser, return the error message if it is not valid lua.
+        Results are cached: the same usage examples come back across files.
+    """
+    try:
+        ast.parse(src)
+    except Exception as e:
+        return str(e)
+    return None
+
+
 def read_index(index: nodes.Index) -> (str, str):
     """
     Get the idx and value part of an nodes.Index as str.
@@ -634,7 +647,14 @@ def get_lua_function_name(node: Function):
 
 
 # noinspection PyPep8Naming
-class TreeVisitor:
+class TreeVisitor(astutils.AstVisitor):
+    """ Walk the whole ast and build the doc model.
+        visit_<NodeClass> methods are dispatched through the class table of
+        AstVisitor, subclasses use the visitor of their nearest base class.
+        Nodes without a visitor (names, literals, ...) are not descended into
+        and cost a single table lookup.
+    """
+
     def __init__(self, doc_options: DocOptions, file_path: str):
         self._doc_options = doc_options
         self.parser = LuaDocParser(self._doc_options, file_path)
@@ -652,19 +672,6 @@ class TreeVisitor:
             LuaValue: self._add_data,
         }
 
-    def visit(self, node):
-        if node is None:
-            return
-        if isinstance(node, Node):
-            name = 'visit_' + node.__class__.__name__
-            visitor = getattr(self, name, None)
-            if visitor:
-                visitor(node)
-
-        elif isinstance(node, list):
-            for n in node:
-                self.visit(n)
-
     def get_model(self) -> LuaModule:
         """ Retrieve the final doc model.
         """
@@ -679,7 +686,7 @@ class TreeVisitor:
             if len(self._class_map) != 1:
                 raise SyntaxException('in a @classmod, only one class is allowed')
 
-            lua_class = self._class_map[list(self._class_map.keys())[0]]
+            lua_class = next(iter(self._class_map.values()))
             lua_class.name = model.name
             lua_class.desc = model.desc
             lua_class.usage = model.usage
@@ -701,7 +708,7 @@ class TreeVisitor:
     def _add_class(self, ldoc_node: LuaClass, ast_node):
         # try to extract class name in source in case of assignment
         if isinstance(ast_node, Assign) and len(ast_node.targets) == 1:
-            first_target: nodes.Expression = cast(Assign, ast_node).targets[0]
+            first_target: nodes.Expression = ast_node.targets[0]
             if isinstance(first_target, nodes.Name):
                 ldoc_node.name_in_source = first_target.id
         if ldoc_node.name_in_source == "":
@@ -723,7 +730,7 @@ class TreeVisitor:
         """
         # check if we need to deduce ldoc_node.name from ast_node
         if not ldoc_node.name:
-            if type(ast_node.name) == Name and ast_node.name.id:
+            if type(ast_node.name) is Name and ast_node.name.id:
                 # must be completed by code ?
                 if ldoc_node.name == '':
                     ldoc_node.name = ast_node.name.id
@@ -732,11 +739,11 @@ class TreeVisitor:
         self._check_function_args(ldoc_node, ast_node)
 
         if isinstance(ast_node, Method):
-            # try to register this function in a class
-            class_name = cast(Method, ast_node).source.id
-
-            if class_name in self._class_map:
-                self._class_map[class_name].methods.append(ldoc_node)
+            # try to register this function in a class, not for nested tables (a.b:c)
+            source: nodes.Expression = ast_node.source
+            lua_class = self._class_map.get(source.id) if isinstance(source, Name) else None
+            if lua_class is not None:
+                lua_class.methods.append(ldoc_node)
             else:
                 self._function_list.append(ldoc_node)
         # static method
@@ -749,8 +756,9 @@ class TreeVisitor:
                 func_name = idx
                 ldoc_node.name = func_name
                 ldoc_node.is_static = True
-                if class_name in self._class_map:
-                    self._class_map[class_name].methods.append(ldoc_node)
+                lua_class = self._class_map.get(class_name)
+                if lua_class is not None:
+                    lua_class.methods.append(ldoc_node)
                 elif self._module and not self._module.is_class_mod:
                     self._module.functions.append(ldoc_node)
 
@@ -791,9 +799,11 @@ class TreeVisitor:
     def _process_ldoc(self, ast_node):
         """Sort ldoc nodes by type in map"""
         ldoc_nodes, pending_str = self.parser.parse_comments(ast_node)
+        type_handler = self._type_handler
         for n in ldoc_nodes:
-            if type(n) in self._type_handler:
-                self._type_handler[type(n)](n, ast_node)
+            handler = type_handler.get(type(n))
+            if handler is not None:
+                handler(n, ast_node)
         return ldoc_nodes, pending_str
 
     # noinspection PyMethodMayBeStatic
@@ -801,11 +811,11 @@ class TreeVisitor:
         """
         Automatically create param doc from a Function ast node.
         """
-        doc_param_dict: Dict[str, LuaParam] = {p.name: p for p in doc_node.params}
+        doc_param_names: Set[str] = {p.name for p in doc_node.params}
 
         for arg in ast_node.args:
             if isinstance(arg, nodes.Name):
-                if arg.id not in doc_param_dict:
+                if arg.id not in doc_param_names:
                     doc_node.params.append(LuaParam(name=arg.id, desc=""))
             elif isinstance(arg, nodes.Varargs):
                 doc_node.params.append(LuaParam(name="...", desc=""))
@@ -824,7 +834,7 @@ class TreeVisitor:
             args_map = zip(func_doc_node.params, func_ast_node.args)
 
             for doc, ast_node in args_map:
-                if type(ast_node) != Varargs:
+                if type(ast_node) is not Varargs:
                     if doc.name != ast_node.id:
                         self._report_error(func_ast_node, 'function: "%s": doc param found "%s", expected "%s"',
                                            func_doc_node.name, doc.name, ast_node.id)
@@ -832,10 +842,9 @@ class TreeVisitor:
     # noinspection PyMethodMayBeStatic
     def _check_usage_field(self, usage: str):
         if len(usage) > 0:
-            try:
-                ast.parse(usage)
-            except Exception as e:
-                logging.warning("Invalid usage exemple: " + str(e))
+            error = get_lua_syntax_error(usage)
+            if error is not None:
+                logging.warning("Invalid usage exemple: " + error)
 
     # ####################################################################### #
     # Root Nodes                                                              #
@@ -845,23 +854,20 @@ class TreeVisitor:
         self.visit(node.body)
 
     def visit_Block(self, node):
-        self.visit(node.body)
-
-    def visit_Node(self, node):
-        pass
+        self._visit_list(node.body)
 
     # ####################################################################### #
     # Assignments                                                             #
     # ####################################################################### #
     def visit_Assign(self, node):
         self._process_ldoc(node)
-        self.visit(node.targets)
-        self.visit(node.values)
+        self._visit_list(node.targets)
+        self._visit_list(node.values)
 
     def visit_LocalAssign(self, node):
         self._process_ldoc(node)
-        self.visit(node.targets)
-        self.visit(node.values)
+        self._visit_list(node.targets)
+        self._visit_list(node.values)
 
     # ####################################################################### #
     # Control Structures                                                      #
@@ -878,8 +884,8 @@ class TreeVisitor:
         self.visit(node.test)
 
     def visit_Forin(self, node):
-        self.visit(node.iter)
-        self.visit(node.targets)
+        self._visit_list(node.iter)
+        self._visit_list(node.targets)
         self.visit(node.body)
 
     def visit_Fornum(self, node):
@@ -905,26 +911,24 @@ class TreeVisitor:
     def visit_Function(self, node: Function):
         doc_nodes, pending_str = self._process_ldoc(node)
 
-        for doc_node in doc_nodes:
-            if isinstance(doc_node, LuaFunction):
-                # check if it's a static method: foo.bar()
-                if isinstance(node.name, Index):
-                    # for now handle only foo.bar syntax
-                    if isinstance(node.name.idx, Name) and isinstance(node.name.value, Name):
-                        potential_cls_name: str = node.name.value.id
-                        # auto-create class doc model
-                        if potential_cls_name not in self._class_map and self._function_list:
-                            self._class_map[potential_cls_name] = LuaClass(potential_cls_name)
-                            func_model = self._function_list.pop()
-                            self._check_function_args(func_model, node)
-                            self._class_map[potential_cls_name].methods.append(func_model)
-
-        self.visit(node.args)
+        # check if it's a static method: foo.bar(), for now handle only foo.bar syntax
+        name = node.name
+        if (doc_nodes and isinstance(name, Index) and isinstance(name.idx, Name) and isinstance(name.value, Name)
+                and any(isinstance(doc_node, LuaFunction) for doc_node in doc_nodes)):
+            potential_cls_name: str = name.value.id
+            # auto-create class doc model
+            if potential_cls_name not in self._class_map and self._function_list:
+                lua_class = self._class_map[potential_cls_name] = LuaClass(potential_cls_name)
+                func_model = self._function_list.pop()
+                self._check_function_args(func_model, node)
+                lua_class.methods.append(func_model)
+
+        self._visit_list(node.args)
         self.visit(node.body)
 
     def visit_LocalFunction(self, node: LocalFunction):
         self._process_ldoc(node)
-        self.visit(node.args)
+        self._visit_list(node.args)
         self.visit(node.body)
 
     def visit_Method(self, node: Method):
@@ -959,11 +963,11 @@ class TreeVisitor:
                     self._class_map[node.source.id].methods.append(func_model)
 
         self.visit(node.source)
-        self.visit(node.args)
+        self._visit_list(node.args)
         self.visit(node.body)
 
     def visit_AnonymousFunction(self, node):
-        self.visit(node.args)
+        self._visit_list(node.args)
         self.visit(node.body)
 
     def visit_Index(self, node):
@@ -973,12 +977,12 @@ class TreeVisitor:
     def visit_Call(self, node):
         self._process_ldoc(node)
         self.visit(node.func)
-        self.visit(node.args)
+        self._visit_list(node.args)
 
     def visit_Invoke(self, node):
         self.visit(node.source)
         self.visit(node.func)
-        self.visit(node.args)
+        self._visit_list(node.args)
 
     # ####################################################################### #
     # Operators                                                               #
@@ -991,7 +995,7 @@ class TreeVisitor:
     # Types and Values                                                        #
     # ####################################################################### #
     def visit_Table(self, node: nodes.Table):
-        self.visit(node.fields)
+        self._visit_list(node.fields)
 
     def visit_Field(self, node: nodes.Field):
         self._process_ldoc(node)
@@ -999,11 +1003,13 @@ class TreeVisitor:
         self.visit(node.value)
 
     def visit_Return(self, node):
-        self.visit(node.values)
+        self._visit_list(node.values)
 
 
 class DocParser:
-    def __init__(self, doc_options: DocOptions = DocOptions()):
+    def __init__(self, doc_options: DocOptions = None):
+        if doc_options is None:
+            doc_options = DocOptions()
         self._doc_options = doc_options
 
     def build_module_doc_model(self, input_src: str, file_path: str) -> LuaModule:
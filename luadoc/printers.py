@@ -1,25 +1,101 @@
+import re
 import json
+import math
+import functools
+import textwrap
 from typing import List
 from luadoc.model import *
 
+try:
+    import orjson
+except ImportError:  # optional, only speeds up json output
+    orjson = None
+
 
 def to_pretty_str(modules: List[LuaModule]):
     return PythonStyleVisitor().visit(modules)
 
 
+def _json_default(o):
+    to_json = getattr(o, "to_json", None)
+    if to_json is not None:
+        return to_json() if callable(to_json) else None
+    if isinstance(o, LuaNode):
+        return o.to_dict()
+    return o.__dict__
+
+
 class JSONEncoder(json.JSONEncoder):
     def default(self, o):
-        try:
-            to_json = getattr(o, "to_json")
-            if callable(to_json):
-                return to_json()
+        return _json_default(o)
+
+
+_INDENT_RE = re.compile(r"^ +", re.MULTILINE)
+
+
+def _has_orjson_float(obj) -> bool:
+    """ True if obj contains a float that orjson does not write like json
+        (exponent notation, nan and infinities), nodes are not descended into.
+    """
+    if type(obj) is float:
+        return not math.isfinite(obj) or 'e' in repr(obj)
+    if isinstance(obj, (list, tuple)):
+        return any(_has_orjson_float(item) for item in obj)
+    if isinstance(obj, dict):
+        return any(_has_orjson_float(item) for item in obj.values())
+    return False
+
+
+class _OrjsonFallback(Exception):
+    pass
+
 
-        except AttributeError:
-            return o.__dict__
+def _orjson_default(o):
+    data = _json_default(o)
+    if _has_orjson_float(data):
+        raise _OrjsonFallback()
+    return data
+
+
+def json_dumps(obj, sort_keys: bool = False) -> str:
+    """ Serialize obj to a json string indented with 4 spaces.
+        orjson is used if it is installed, the output is the same as json.dumps:
+        data orjson would write differently falls back to json.
+    """
+    if orjson and not _has_orjson_float(obj):
+        option = orjson.OPT_INDENT_2 | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            # json.dumps escapes non ascii characters (no bytes.isascii before python 3.7)
+            text = orjson.dumps(obj, default=_orjson_default, option=option).decode('ascii')
+        except orjson.JSONEncodeError:  # non str keys, big integers, floats...
+            text = None
+        except UnicodeDecodeError:
+            text = None
+        if text is not None:
+            return _INDENT_RE.sub(lambda m: m.group() * 2, text)
+    return json.dumps(obj, cls=JSONEncoder, sort_keys=sort_keys, indent=4)
 
 
 def to_pretty_json(modules: List[LuaModule]) -> str:
-    return json.dumps(modules, cls=JSONEncoder, indent=4)
+    return json_dumps(modules)
+
+
+class JSONArrayWriter:
+    """ Write modules one by one to a stream as a JSON array.
+        The output is the same as to_pretty_json, without holding all modules in memory.
+    """
+
+    def __init__(self, out):
+        self._out = out
+        self._count = 0
+
+    def write(self, module: LuaModule):
+        self._out.write('[\n' if self._count == 0 else ',\n')
+        self._out.write(textwrap.indent(json_dumps(module), ' ' * 4))
+        self._count += 1
+
+    def close(self):
+        self._out.write('\n]' if self._count else '[]')
 
 
 class VisitorException(Exception):
@@ -42,22 +118,25 @@ def _declaring_class(obj):
 _methods = {}
 
 
+@functools.lru_cache(maxsize=128)
+def _lookup(visitor_type, arg_type):
+    """Find the visitor method of visitor_type for arg_type, or None.
+    If no visitor method is found for arg_type, search in its bases (MRO order).
+    """
+    visitor_name = _qualname(visitor_type)
+    for base in arg_type.__mro__:
+        method = _methods.get((visitor_name, base))
+        if method:
+            return method
+    return None
+
+
 # Delegating visitor implementation
 def _visitor_impl(self, arg):
     """Actual visitor method implementation."""
-    if (_qualname(type(self)), type(arg)) in _methods:
-        method = _methods[(_qualname(type(self)), type(arg))]
+    method = _lookup(type(self), type(arg))
+    if method:
         return method(self, arg)
-    else:
-        # if no visitor method found for this arg type,
-        # search in parent arg type:
-        argParentType = arg.__class__.__bases__[0]
-        while argParentType != object:
-            if (_qualname(type(self)), argParentType) in _methods:
-                method = _methods[(_qualname(type(self)), argParentType)]
-                return method(self, arg)
-            else:
-                argParentType = argParentType.__bases__[0]
     raise VisitorException('No visitor found for class ' + str(type(arg)))
 
 
@@ -104,7 +183,7 @@ class PythonStyleVisitor:
         elif isinstance(object, LuaNode):
             if isList:
                 return '{} 1 key'
-            keyCount = len([attr for attr in object.__dict__.keys() if not attr.startswith("_")])
+            keyCount = len([attr for attr in object.to_dict().keys() if not attr.startswith("_")])
             res += '{} ' + str(keyCount) + ' '
             if keyCount > 1:
                 res += 'keys'
@@ -146,7 +225,7 @@ class PythonStyleVisitor:
 
         self.indent()
 
-        for attr, attrValue in node.__dict__.items():
+        for attr, attrValue in node.to_dict().items():
             if not attr.startswith(('_', 'comments')):
                 if isinstance(attrValue, LuaNode) or isinstance(attrValue, list):
                     res += self.indentStr() + attr + ': ' + self.prettyCount(attrValue)
@@ -0,0 +1,23 @@
+local Car = {}
+
+--- Create the default factory.
+Car.factory = Car.factory or function()
+    local Engine = {}
+
+    --- Start the engine
+    --- @param speed number the initial speed
+    function Engine:start(speed) end
+
+    return Engine
+end
+
+--- Scaled speed.
+Car.speed = 2 * (function()
+    --- Compute the base speed
+    --- @return number
+    local function base() return 10 end
+
+    return base()
+end)()
+
+return Car
@@ -0,0 +1,7 @@
+local Garage = { Car = {} }
+
+--- Start the engine
+--- @param key string the car key
+function Garage.Car:start(key) end
+
+return Garage
@@ -0,0 +1,98 @@
+import gc
+import io
+import os
+import tempfile
+import unittest
+from luadoc import FilesProcessor, DocOptions
+from luadoc.core import _CacheDir, _parse_bytes
+from luadoc.model import LuaModule
+from luadoc.printers import to_pretty_json, JSONArrayWriter
+
+
+class FilesProcessorTestCase(unittest.TestCase):
+    CURRENT_DIR: str = os.path.dirname(__file__)
+    SOURCE_ROOT: str = os.path.join(CURRENT_DIR, "source")
+
+    def get_lua_files(self):
+        return sorted(os.path.join(FilesProcessorTestCase.SOURCE_ROOT, f)
+                      for f in os.listdir(FilesProcessorTestCase.SOURCE_ROOT) if f.endswith(".lua"))
+
+    def test_run(self):
+        files = self.get_lua_files()
+        model = FilesProcessor(2, DocOptions()).run(files)
+        self.assertEqual(files, sorted(m.file_path for m in model))
+
+    def test_run_cached(self):
+        files = self.get_lua_files()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = FilesProcessor(2, DocOptions(), cache_dir).run(files)
+            self.assertEqual(len(files), len([f for f in os.listdir(cache_dir) if f.endswith(".pkl")]))
+
+            second = FilesProcessor(2, DocOptions(), cache_dir).run(files)
+            self.assertEqual(sorted(to_pretty_json(m) for m in first),
+                             sorted(to_pretty_json(m) for m in second))
+
+    def test_cache_replays_diagnostics(self):
+        source = b"--- @tparam number\nfunction foo(x) end\n"
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = _CacheDir(cache_dir, DocOptions())
+            for file_path in ["a.lua", "a.lua", "b.lua"]:
+                with self.assertLogs(level="ERROR") as logs:
+                    _parse_bytes(DocOptions(), file_path, source, cache)
+                self.assertEqual(1, len(logs.output))
+                self.assertIn(file_path + ": l.invalid @tparam tag", logs.output[0])
+
+    def test_cache_not_writable(self):
+        files = self.get_lua_files()
+        with tempfile.NamedTemporaryFile() as not_a_dir:
+            model = FilesProcessor(2, DocOptions(), os.path.join(not_a_dir.name, "cache")).run(files)
+        self.assertEqual(files, sorted(m.file_path for m in model))
+
+    def test_run_streamed(self):
+        files = self.get_lua_files()
+        modules = []
+        out = io.StringIO()
+        writer = JSONArrayWriter(out)
+
+        def on_result(module):
+            modules.append(module)
+            writer.write(module)
+
+        self.assertEqual([], FilesProcessor(2, DocOptions()).run(files, on_result))
+        writer.close()
+        self.assertEqual(len(files), len(modules))
+        self.assertEqual(to_pretty_json(modules), out.getvalue())
+
+    def test_run_streamed_releases_modules(self):
+        def count_modules():
+            gc.collect()
+            return sum(1 for o in gc.get_objects() if type(o) is LuaModule)
+
+        sources = self.get_lua_files()
+        alive = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            files = []
+            for i in range(30):
+                files.append(os.path.join(tmp_dir, "%d.lua" % i))
+                with open(sources[i % len(sources)]) as src, open(files[-1], 'w') as dst:
+                    dst.write(src.read() + "\n-- %d\n" % i)  # no duplicated content
+
+            before = count_modules()
+            FilesProcessor(2, DocOptions()).run(files, lambda module: alive.append(count_modules() - before))
+
+        self.assertEqual(30, len(alive))
+        # handled modules are released, the last one is the module being handled
+        self.assertEqual(1, alive[-1])
+
+    def test_run_duplicated_files(self):
+        source = self.get_lua_files()[0]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            files = [source]
+            for name in ["a.lua", "b.lua"]:
+                files.append(os.path.join(tmp_dir, name))
+                with open(source, 'rb') as src, open(files[-1], 'wb') as dst:
+                    dst.write(src.read())
+
+            model = FilesProcessor(2, DocOptions()).run(files)
+            self.assertEqual(sorted(files), sorted(m.file_path for m in model))
+            self.assertEqual(1, len(set(to_pretty_json(m.classes) for m in model)))
@@ -1,6 +1,10 @@
+import random
 import unittest
+import luadoc.luadoc as luadoc
 import luadoc.model as model
-from luadoc.emmylua import parse_param_field
+from luadoc.emmylua import parse_param, parse_param_field, parse_param_field_peg
+from luadoc.emmylua_rd import parse_param_field as parse_param_field_rd, EmmyLuaSyntaxError
+from luadoc.printers import to_pretty_json
 
 
 class ParserTestCase(unittest.TestCase):
@@ -43,3 +47,82 @@ class ParserTestCase(unittest.TestCase):
         self.assertEqual(len(t.arg_types[1].arg_types), 1)
         self.assertIsInstance(t.arg_types[1].arg_types[0], model.LuaTypeNumber)
 
+    def test_parse_table_type(self):
+        t, desc = parse_param_field("table a table")
+        self.assertIsInstance(t, model.LuaTypeTable)
+        t, desc = parse_param_field("tab a table")
+        self.assertIsInstance(t, model.LuaTypeTable)
+
+    def test_rd_parser_matches_peg_parser(self):
+        fields = [
+            "string",
+            "string the string",
+            "string @the string",
+            "string|number the string",
+            "string | number|nil the string",
+            "string, number two types",
+            "a.b.c[] x",
+            "a.b [] x",
+            "number[]|string[] some array",
+            "table<string, number> the number table",
+            "table < string , table<a,b> > [] foo",
+            "table the table",
+            "fun(n: number, s: string) : nil",
+            "fun(s: string, f: fun(i: number))",
+            "fun() desc",
+            "fun(a: number",
+            "function[]",
+            "  any\tdesc",
+        ]
+        for field in fields:
+            with self.subTest(field=field):
+                peg_type, peg_desc = parse_param_field_peg(field)
+                rd_type, rd_desc = parse_param_field_rd(field)
+                self.assertEqual(to_pretty_json(peg_type), to_pretty_json(rd_type))
+                self.assertEqual(peg_desc, rd_desc)
+
+    def test_rd_parser_invalid_field(self):
+        for field in ["", "@desc", "[] desc", "string\nnumber"]:
+            with self.subTest(field=field):
+                self.assertRaises(EmmyLuaSyntaxError, parse_param_field_rd, field)
+
+    def test_rd_parser_matches_peg_parser_random(self):
+        def parse(parse_fn, field):
+            try:
+                lua_type, desc = parse_fn(field)
+                return to_pretty_json(lua_type), desc
+            except Exception:
+                return None
+
+        tokens = ["fun", "(", ")", ":", ",", "|", "[]", "table", "tab", "<", ">",
+                  " ", "\t", "a", "b.c", "number", "@", "x y"]
+        rnd = random.Random(42)
+        for _ in range(2000):
+            field = "".join(rnd.choice(tokens) for _ in range(rnd.randint(1, 10)))
+            self.assertEqual(parse(parse_param_field_peg, field), parse(parse_param_field_rd, field), field)
+
+    def test_ldoc_parse_type(self):
+        self.assertIsInstance(luadoc.parse_type("table"), model.LuaTypeTable)
+        self.assertIsInstance(luadoc.parse_type("tab"), model.LuaTypeTable)
+        self.assertIsInstance(luadoc.parse_type("int"), model.LuaTypeNumber)
+        self.assertEqual("Foo", luadoc.parse_type("Foo").name)
+
+    def test_parse_param(self):
+        name, t, desc = parse_param("self foo.Bar @the object")
+        self.assertEqual("self", name)
+        self.assertIsInstance(t, model.LuaTypeCustom)
+        self.assertEqual("foo.Bar", t.name)
+        self.assertEqual("the object", desc)
+        self.assertRaises(ValueError, parse_param, "self")
+
+    def test_single_type_fast_path_matches_peg_parser(self):
+        fields = ["string", "foo.Bar the object", "foo.Bar @the object", "string  ", "string\tdesc",
+                  "a. b", "fun desc", "table desc", "string[] desc", "string [] desc", "string [x",
+                  "string|nil", "string , number", "table <string, number>", "fun (a: number)",
+                  "string @[] desc"]
+        for field in fields:
+            with self.subTest(field=field):
+                peg_type, peg_desc = parse_param_field_peg(field)
+                lua_type, desc = parse_param_field.__wrapped__(field)
+                self.assertEqual(to_pretty_json(peg_type), to_pretty_json(lua_type))
+                self.assertEqual(peg_desc, desc)
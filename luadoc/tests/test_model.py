@@ -0,0 +1,50 @@
+import copy
+import pickle
+import unittest
+import luadoc.model as model
+
+
+class LuaTypePrimitiveTestCase(unittest.TestCase):
+    def test_single_instance(self):
+        self.assertIs(model.LuaTypeNumber(), model.LuaTypeNumber())
+        self.assertIsNot(model.LuaTypeNumber(), model.LuaTypeString())
+        self.assertEqual("number", model.LuaTypeNumber().id)
+        self.assertEqual({"id": "any"}, model.LuaTypeAny().to_dict())
+
+    def test_copy_and_pickle(self):
+        lua_type = model.LuaTypeTable()
+        self.assertIs(lua_type, copy.copy(lua_type))
+        self.assertIs(lua_type, copy.deepcopy(lua_type))
+        self.assertIs(lua_type, pickle.loads(pickle.dumps(lua_type)))
+
+
+class LuaNodeTestCase(unittest.TestCase):
+    def test_to_dict(self):
+        func = model.LuaFunction("foo")
+        self.assertEqual(["start_char", "stop_char", "name", "short_desc", "desc"], list(func.to_dict())[:5])
+        self.assertFalse(hasattr(func, "__dict__"))
+
+        value = model.LuaValue("bar", model.LuaTypeNumber())
+        self.assertEqual(["name", "short_desc", "desc", "visibility", "constant", "type", "value"],
+                         list(value.to_dict()))
+
+    def test_pickle(self):
+        lua_class = model.LuaClass("Foo")
+        lua_class.fields.append(model.LuaClassField("bar", "a field", model.LuaTypeCustom("Bar")))
+        self.assertEqual(lua_class.to_dict().keys(), pickle.loads(pickle.dumps(lua_class)).to_dict().keys())
+        self.assertEqual("Bar", pickle.loads(pickle.dumps(lua_class)).fields[0].type.name)
+
+    def test_class_mod_flag(self):
+        module = model.LuaModule("foo")
+        self.assertFalse(module.is_class_mod)
+        with self.assertRaises(AttributeError):
+            module.isClassMod = True
+        self.assertFalse(hasattr(module, "isClassMod"))
+
+
+class ParseTypeTestCase(unittest.TestCase):
+    def test_parse_type(self):
+        self.assertIs(model.parse_type("table"), model.parse_type("table"))
+        self.assertIs(model.LuaTypeTable(), model.parse_type("tab"))
+        self.assertIs(model.LuaTypeNumber(), model.parse_type("float"))
+        self.assertIsInstance(model.parse_type("foo.Bar"), model.LuaTypeCustom)
@@ -61,3 +61,9 @@ class ParserTestCase(unittest.TestCase):
 
     def test_emmy_lua_class(self):
         self.make_test_from_sources("emmy_lua_class")
+
+    def test_method_on_nested_table(self):
+        self.make_test_from_sources("method_on_nested_table")
+
+    def test_expression_functions(self):
+        self.make_test_from_sources("expression_functions")
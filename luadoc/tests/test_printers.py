@@ -0,0 +1,67 @@
+import io
+import json
+import unittest
+from unittest import mock
+import luadoc.model as model
+import luadoc.printers as printers
+from luadoc.printers import json_dumps, JSONEncoder, JSONArrayWriter, PythonStyleVisitor
+
+
+class JsonDumpsTestCase(unittest.TestCase):
+    def assertSameAsJson(self, obj, sort_keys=False):
+        self.assertEqual(json.dumps(obj, cls=JSONEncoder, sort_keys=sort_keys, indent=4),
+                         json_dumps(obj, sort_keys=sort_keys))
+
+    def test_model(self):
+        func = model.LuaFunction("foo", "a function")
+        func.params.append(model.LuaParam("bar", "a param", model.LuaTypeArray(model.LuaTypeString())))
+        self.assertSameAsJson([func, [], {}])
+
+    def test_sort_keys(self):
+        self.assertSameAsJson({"b": [1, 2.5, None], "a": {"d": True, "c": ""}}, sort_keys=True)
+
+    def test_fallback(self):
+        self.assertSameAsJson({"é": "non ascii"})
+        self.assertSameAsJson({1: "int key"})
+        self.assertSameAsJson([2 ** 70])
+
+    @unittest.skipUnless(printers.orjson, "orjson is not installed")
+    def test_non_ascii_fallback_without_isascii(self):
+        class Bytes36(bytes):  # python 3.6 bytes have no isascii
+            @property
+            def isascii(self):
+                raise AttributeError("isascii")
+
+        orjson_dumps = printers.orjson.dumps
+
+        def dumps(*args, **kwargs):
+            return Bytes36(orjson_dumps(*args, **kwargs))
+
+        with mock.patch.object(printers.orjson, "dumps", dumps):
+            func = model.LuaFunction("foo", "déjà vu")
+            self.assertSameAsJson([func, {"a": "ascii"}])
+            out = io.StringIO()
+            writer = JSONArrayWriter(out)
+            writer.write(model.LuaModule("é"))
+            writer.close()
+            self.assertEqual(json_dumps([model.LuaModule("é")]), out.getvalue())
+
+    def test_floats(self):
+        floats = [2.5, 1e16, 1e-7, 1e-5, float("inf"), float("-inf"), float("nan")]
+        self.assertSameAsJson(floats)
+        values = []
+        for value in floats:
+            values.append(model.LuaValue("v", model.LuaTypeNumber()))
+            values[-1].value = value
+        self.assertSameAsJson(values)
+
+
+class PythonStyleVisitorTestCase(unittest.TestCase):
+    def test_visitor_lookup_uses_mro(self):
+        class Mixin:
+            pass
+
+        class MixedType(Mixin, model.LuaTypeCustom):
+            pass
+
+        self.assertIn("MixedType: {} 2 keys", PythonStyleVisitor().visit(MixedType("Foo")))
@@ -34,11 +34,15 @@ setup(
         'Programming Language :: Python :: 3.6'
     ],
     install_requires=[
-        'luaparser>=3.2.1', 'parsimonious'
+        'luaparser>=3.2.1'
     ],
+    extras_require={
+        'orjson': ['orjson'],
+        'test': ['parsimonious']
+    },
     entry_points={
         'console_scripts': [
-            'luadoc = luadoc.__main__:main'
+            'luadoc = luadoc.cli:main'
         ]
     },
     include_package_data=True